@@ -0,0 +1,297 @@
+import csv
+import mmap
+import os
+from array import array
+from interpreter import Interpreter
+from nodes import PrintNode
+
+try:
+    import numpy  # Only needed for reading .npy columns
+except ImportError:
+    numpy = None
+
+COLUMN_EXTENSION = '.col'  # Raw binary column: native-endian float64 values, no header
+DEFAULT_CHUNK_SIZE = 65536  # Number of values buffered per output column before writing
+
+
+class MappedColumn:
+    """
+    A read-only column of float64 values backed by a memory-mapped binary file.
+    Values are read from the mapping on access, so the file is never loaded fully.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size % 8 != 0:
+                raise ValueError(f"Column file {path} is not a whole number of float64 values")
+            # mmap cannot map an empty file, so an empty column gets an empty view instead
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            self._values = memoryview(self._map if self._map is not None else b'').cast('d')
+        except BaseException:
+            # Don't leak the mapping or the handle when the file cannot be mapped
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+            raise
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Copy slices out so no view on the mapping outlives close()
+            with self._values[index] as view:
+                return view.tolist()
+        return self._values[index]
+
+    def close(self):
+        """
+        Releases the view, the mapping and the underlying file.
+        """
+        try:
+            self._values.release()
+            if self._map is not None:
+                self._map.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"MappedColumn({self.path})"
+
+
+def load_column(path):
+    """
+    Opens a single input column without reading it into memory.
+
+    Args:
+        path (str): A `.npy` file or a raw binary column file.
+
+    Returns:
+        An indexable sequence of numbers (a numpy memmap or a MappedColumn).
+    """
+    if path.endswith('.npy'):
+        if numpy is None:
+            raise ValueError(f"Reading {path} requires numpy")
+        column = numpy.load(path, mmap_mode='r')
+        if column.ndim != 1:
+            raise ValueError(f"Column file {path} must hold a one-dimensional array")
+        return column
+    return MappedColumn(path)
+
+
+def open_input_columns(paths):
+    """
+    Opens input columns, naming each variable after its file name without extension.
+    e.g., `data/Radius.npy` provides the variable `Radius`.
+
+    Args:
+        paths (list): Paths of `.npy` or raw binary column files.
+
+    Returns:
+        dict: Variable name mapped to its column.
+    """
+    columns = {}
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        columns[name] = load_column(path)
+    return columns
+
+
+def iter_column_rows(columns):
+    """
+    Yields one memory dictionary per row of the given columns.
+
+    Args:
+        columns (dict): Variable name mapped to an indexable column.
+
+    Raises:
+        ValueError: If the columns do not all have the same length.
+    """
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("Input columns must all have the same length")
+    row_count = lengths.pop() if lengths else 0
+    names = list(columns)
+    sources = [columns[name] for name in names]
+    for index in range(row_count):
+        yield {name: float(source[index]) for name, source in zip(names, sources)}
+
+
+def read_csv_rows(path):
+    """
+    Streams a CSV file with a header row, yielding one memory dictionary per line.
+    Only the current line is held in memory.
+    """
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        names = [name.strip() for name in next(reader, [])]
+        for line_number, fields in enumerate(reader, start=2):
+            if not fields:
+                continue  # Skip blank lines
+            if len(fields) != len(names):
+                raise ValueError(f"Line {line_number} of {path} has {len(fields)} fields, expected {len(names)}")
+            yield {name: float(field) for name, field in zip(names, fields)}
+
+
+class ColumnWriter:
+    """
+    Writes float64 values to a raw binary column file in chunks.
+    """
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._buffer = array('d')
+        self._file = open(path, 'wb')
+
+    def write(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered values to the file and empties the buffer.
+        """
+        self._buffer.tofile(self._file)
+        del self._buffer[:]
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ColumnarSink:
+    """
+    Output sink writing each output variable to `<directory>/<name>.col`.
+    """
+    def __init__(self, directory, names, chunk_size=DEFAULT_CHUNK_SIZE):
+        os.makedirs(directory, exist_ok=True)
+        self.writers = []
+        try:
+            for name in names:
+                self.writers.append(ColumnWriter(os.path.join(directory, name + COLUMN_EXTENSION), chunk_size))
+        except BaseException:
+            self.close()  # Close the writers opened before the failure
+            raise
+
+    def write_row(self, values):
+        for writer, value in zip(self.writers, values):
+            writer.write(value)
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CsvSink:
+    """
+    Output sink writing a CSV file with one column per output variable.
+    """
+    def __init__(self, path, names):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(names)
+
+    def write_row(self, values):
+        self._writer.writerow([repr(value) for value in values])
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def show_column(name, occurrence):
+    """
+    Returns the output column name for the given occurrence (counting from 1) of `show <name>`.
+    The first is named after the variable, later ones get a suffix, e.g. `A`, `A_2`, `A_3`.
+    Identifiers cannot contain underscores, so suffixed names never clash with variables.
+    """
+    return name if occurrence == 1 else f"{name}_{occurrence}"
+
+
+def show_columns(nodes):
+    """
+    Returns one output column name per `show` statement, in program order.
+    """
+    occurrences = {}
+    names = []
+    for node in nodes:
+        if isinstance(node, PrintNode):
+            occurrences[node.variable] = occurrences.get(node.variable, 0) + 1
+            names.append(show_column(node.variable, occurrences[node.variable]))
+    return names
+
+
+def run_batch(nodes, rows, sink, outputs=None):
+    """
+    Runs a parsed program once per input row and writes the outputs to a sink.
+
+    Every `show` statement has its own output column (see show_columns()), so a
+    program that shows a variable twice writes both values, as the text output would.
+    An output that names a variable instead of a show column takes its final value.
+
+    Args:
+        nodes (list): The AST returned by Parser.parse().
+        rows (iterable): Memory dictionaries, e.g. from iter_column_rows() or read_csv_rows().
+        sink: A ColumnarSink or CsvSink opened for the same output names. Use it in a
+            `with` block so buffered output is flushed and files closed if a row fails.
+        outputs (list): Column names to write. Defaults to one column per show statement.
+
+    Returns:
+        int: The number of rows processed.
+    """
+    names = outputs if outputs is not None else show_columns(nodes)
+    shown = {}
+    occurrences = {}
+
+    def capture(name, value):
+        # Statements run in program order, so the nth show of a name is its nth show statement
+        occurrences[name] = occurrences.get(name, 0) + 1
+        shown[show_column(name, occurrences[name])] = value
+
+    interpreter = Interpreter(output=capture)  # Capture shown values instead of printing
+    count = 0
+    for row in rows:
+        shown.clear()
+        occurrences.clear()
+        interpreter.variables = row
+        interpreter.interpret(nodes)
+        values = []
+        for name in names:
+            if name in shown:
+                values.append(shown[name])
+            elif name in row:
+                values.append(row[name])
+            else:
+                raise ValueError(f"Undefined variable: {name}")
+        sink.write_row(values)
+        count += 1
+    return count
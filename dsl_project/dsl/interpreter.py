@@ -2,12 +2,15 @@ import math
 from nodes import NumberNode, VariableNode, BinaryOperationNode, AssignmentNode, PrintNode, FunctionNode
 
 class Interpreter:
-    def __init__(self, memory=None):
+    def __init__(self, memory=None, output=None):
         """
         Initializes the interpreter with a memory (variable storage).
         If no memory is provided, it creates an empty dictionary for variables.
+        If an output callable is provided, `show` statements call it with
+        (variable name, value) instead of printing the value.
         """
         self.variables = memory if memory is not None else {}
+        self.output = output
 
     def interpret(self, nodes):
         """
@@ -19,6 +22,15 @@ class Interpreter:
         for node in nodes:
             self.evaluate(node)  # Evaluate each node
 
+    def show(self, name, value):
+        """
+        Emits the value of a `show` statement, either to the output callable or to stdout.
+        """
+        if self.output is not None:
+            self.output(name, value)  # Hand the value to the caller
+        else:
+            print(value)  # Print the variable's value
+
     def evaluate(self, node):
         """
         Evaluates a single AST node and performs the appropriate operation.
@@ -77,6 +89,6 @@ class Interpreter:
         elif isinstance(node, PrintNode):
             # Print the value of a variable
             if node.variable in self.variables:
-                print(self.variables[node.variable])  # Print the variable's value
+                self.show(node.variable, self.variables[node.variable])
             else:
                 raise ValueError(f"Undefined variable: {node.variable}")
@@ -1,6 +1,11 @@
+import math
 from lexer import lexer
 from parser import Parser
 from interpreter import Interpreter
+from scheduler import ParallelInterpreter
+from nodes import AssignmentNode, PrintNode
+from batch_io import (ColumnarSink, CsvSink, MappedColumn, iter_column_rows, open_input_columns,
+                      read_csv_rows, run_batch, numpy)
 
 def normalize_output(output, precision=10):
     """
@@ -32,9 +37,10 @@ def run_test_case(code, expected_output):
         sys.stdout = captured_output
         
         interpreter = Interpreter()
-        interpreter.interpret(ast)
-        
-        sys.stdout = sys.__stdout__
+        try:
+            interpreter.interpret(ast)
+        finally:
+            sys.stdout = sys.__stdout__  # Restore stdout even if the program raises
         actual_output = captured_output.getvalue().strip()
         
         # Normalize both expected and actual outputs
@@ -47,6 +53,138 @@ def run_test_case(code, expected_output):
         print(f"Test Failed with Exception!\nCode:\n{code}\nException:\n{str(e)}\n")
 
 
+def run_batch_test_case(code, inputs, expected_columns, outputs=None, use_npy=False):
+    """
+    Runs a batch test case: writes the input columns to disk, runs the program once per row
+    through both the binary columnar and the CSV paths, and compares the output columns.
+    """
+    import os
+    import tempfile
+    from array import array
+    try:
+        if use_npy and numpy is None:
+            print(f"Test Skipped (numpy is not installed)!\nCode:\n{code}\n")
+            return
+        ast = Parser(lexer(code)).parse()
+        names = outputs if outputs is not None else list(expected_columns)
+        with tempfile.TemporaryDirectory() as directory:
+            # Binary columnar round trip
+            paths = []
+            for name, values in inputs.items():
+                if use_npy:
+                    path = os.path.join(directory, name + ".npy")
+                    numpy.save(path, numpy.array(values, dtype=float))
+                else:
+                    path = os.path.join(directory, name + ".col")
+                    with open(path, "wb") as file:
+                        array('d', values).tofile(file)
+                paths.append(path)
+            columns = open_input_columns(paths)
+            out_directory = os.path.join(directory, "out")
+            with ColumnarSink(out_directory, names, chunk_size=2) as sink:  # Small chunks to exercise flushing
+                run_batch(ast, iter_column_rows(columns), sink, outputs)
+            for column in columns.values():
+                if isinstance(column, MappedColumn):
+                    column.close()
+            for name, expected in expected_columns.items():
+                with MappedColumn(os.path.join(out_directory, name + ".col")) as column:
+                    actual = column[:]
+                assert actual == expected, f"Test Failed!\nCode:\n{code}\nColumn {name} expected:\n{expected}\nGot:\n{actual}"
+
+            # CSV round trip
+            csv_input = os.path.join(directory, "input.csv")
+            with open(csv_input, "w") as file:
+                file.write(",".join(inputs) + "\n")
+                for row in zip(*inputs.values()):
+                    file.write(",".join(map(repr, row)) + "\n")
+            csv_output = os.path.join(directory, "output.csv")
+            with CsvSink(csv_output, names) as sink:
+                run_batch(ast, read_csv_rows(csv_input), sink, outputs)
+            actual_columns = {name: [] for name in names}
+            for row in read_csv_rows(csv_output):
+                for name in names:
+                    actual_columns[name].append(row[name])
+            for name, expected in expected_columns.items():
+                assert actual_columns[name] == expected, f"Test Failed!\nCode:\n{code}\nCSV column {name} expected:\n{expected}\nGot:\n{actual_columns[name]}"
+        print(f"Test Passed!\nCode:\n{code}\nOutput:\n{expected_columns}\n")
+    except Exception as e:
+        print(f"Test Failed with Exception!\nCode:\n{code}\nException:\n{str(e)}\n")
+
+
+def run_parallel_test_case(code, workers=2):
+    """
+    Runs a program with Interpreter and with ParallelInterpreter forced onto the worker pool,
+    and checks that shown values, final memory and any error are identical.
+    """
+    def run(interpreter_class, **options):
+        shown = []
+        memory = {}
+        interpreter = interpreter_class(memory=memory, output=lambda name, value: shown.append((name, value)), **options)
+        try:
+            interpreter.interpret(Parser(lexer(code)).parse())
+            error = None
+        except Exception as e:
+            error = str(e)
+        return shown, memory, error
+
+    try:
+        expected = run(Interpreter)
+        actual = run(ParallelInterpreter, workers=workers, force=True)
+        assert actual == expected, f"Test Failed!\nCode:\n{code}\nExpected:\n{expected}\nGot:\n{actual}"
+        print(f"Test Passed!\nCode:\n{code}\nOutput:\n{expected[0]}\n")
+    except Exception as e:
+        print(f"Test Failed with Exception!\nCode:\n{code}\nException:\n{str(e)}\n")
+
+
+def random_program(generator, statements=60, names=8):
+    """
+    Generates a random program of assignments and shows over a few variables,
+    so reassignments and read/write conflicts are frequent.
+    """
+    variables = [f"V{i}" for i in range(names)]
+    lines = [f"set {name} to {i + 1};" for i, name in enumerate(variables)]
+    for _ in range(statements):
+        target = generator.choice(variables)
+        if generator.random() < 0.2:
+            lines.append(f"show {target};")
+        else:
+            left, right = generator.choice(variables), generator.choice(variables)
+            lines.append(f"set {target} to sin({left}) + {right} * {generator.randint(1, 9)};")
+    return "\n".join(lines)
+
+
+def repeated_program(expression, statements):
+    """
+    Builds a large program of independent assignments `set V<i> to <expression>;` reading X,
+    sharing one parsed expression so large programs are cheap to build.
+    """
+    tokens = lexer(f"set X to 0.5; set V0 to {expression};")
+    setup, statement = Parser(tokens).parse()
+    nodes = [setup] + [AssignmentNode(f"V{i}", statement.value) for i in range(statements)]
+    return nodes + [PrintNode("V0"), PrintNode(f"V{statements - 1}")]
+
+
+def run_heuristic_test_case(description, nodes, workers, expect_parallel, context=None):
+    """
+    Checks whether ParallelInterpreter's cost heuristic sends a program to the worker pool,
+    and that running it through the default path gives the same result as Interpreter.
+    """
+    try:
+        interpreter = ParallelInterpreter(workers=workers, context=context)
+        planned = interpreter.plan(nodes) is not None
+        assert planned == expect_parallel, f"Test Failed!\n{description}\nExpected parallel: {expect_parallel}\nGot: {planned}"
+
+        expected, actual = [], []
+        sequential_memory, parallel_memory = {}, {}
+        Interpreter(memory=sequential_memory, output=lambda name, value: expected.append(value)).interpret(nodes)
+        ParallelInterpreter(memory=parallel_memory, output=lambda name, value: actual.append(value),
+                            workers=workers, context=context).interpret(nodes)
+        assert (actual, parallel_memory) == (expected, sequential_memory), f"Test Failed!\n{description}\nExpected:\n{expected}\nGot:\n{actual}"
+        print(f"Test Passed!\n{description}\nParallel: {planned}\n")
+    except Exception as e:
+        print(f"Test Failed with Exception!\n{description}\nException:\n{str(e)}\n")
+
+
 def main():
     # Test Case 1: Simple variable assignment and print
     run_test_case("""
@@ -124,6 +262,105 @@ def main():
     show Result;
     """, "Test Failed with Exception!\nCode:\nset Result to invalid_function(5);\nException:\nUnsupported function: invalid_function\n")
 
+    # Test Case 11: Batch evaluation over binary columns and CSV
+    run_batch_test_case("""
+    set Area to PI * R ** 2;
+    show Area;
+    set Double to R * 2;
+    show Double;
+    """, {"R": [1.0, 2.0, 3.0, 0.5, 10.0]},
+    {"Area": [math.pi * r ** 2 for r in [1.0, 2.0, 3.0, 0.5, 10.0]],
+     "Double": [2.0, 4.0, 6.0, 1.0, 20.0]})
+
+    # Test Case 12: Batch outputs take the shown value, or the final value if never shown
+    run_batch_test_case("""
+    set A to X + Y;
+    show A;
+    set A to 0;
+    set B to X * Y;
+    """, {"X": [1.0, 2.0, 3.0], "Y": [4.0, 5.0, 6.0]},
+    {"A": [5.0, 7.0, 9.0], "B": [4.0, 10.0, 18.0]}, outputs=["A", "B"])
+
+    # Test Case 13: Each show statement gets its own batch output column
+    run_batch_test_case("""
+    set A to X;
+    show A;
+    set A to X * 10;
+    show A;
+    """, {"X": [1.0, 2.0]}, {"A": [1.0, 2.0], "A_2": [10.0, 20.0]})
+
+    # Test Case 14: Batch input from memory-mapped .npy columns
+    run_batch_test_case("""
+    set Root to sqrt(N);
+    show Root;
+    """, {"N": [4.0, 9.0, 16.0]}, {"Root": [2.0, 3.0, 4.0]}, use_npy=True)
+
+    # Test Case 15: Parallel execution matches sequential execution with reassignment
+    run_parallel_test_case("""
+    set A to 10;
+    set A to 20;
+    show A;
+    """)
+
+    # Test Case 16: Independent statements, read-after-write and show order across levels
+    run_parallel_test_case("""
+    set A to 1;
+    set B to 2;
+    set C to A + B;
+    show C;
+    set D to sqrt(C * 3);
+    show A;
+    show D;
+    """)
+
+    # Test Case 17: Write-after-read and write-after-write on the same variable
+    run_parallel_test_case("""
+    set A to 5;
+    set B to A * 2;
+    set A to 7;
+    show B;
+    set A to A + B;
+    set C to A;
+    show A;
+    show C;
+    """)
+
+    # Test Case 18: Undefined variable error in the parallel path
+    run_parallel_test_case("""
+    set A to 1;
+    set B to 2;
+    show A;
+    set C to Missing + B;
+    show C;
+    """)
+
+    # Test Case 19: Random programs give the same output and memory in parallel
+    import random
+    generator = random.Random(27)
+    for _ in range(20):
+        run_parallel_test_case(random_program(generator), workers=generator.choice([2, 3, 4]))
+
+    # Test Case 20: The cost heuristic keeps programs sequential when the pool cannot pay off
+    heavy = "sin(X) * cos(X) + sqrt(X) + atan(X) * exp(X) + log(X + 2) * tan(X) + pow(X, 2) * sin(X) + cos(X)"
+    run_heuristic_test_case("Small program, 4 workers", Parser(lexer("""
+    set A to 1;
+    set B to sin(A);
+    set C to cos(A);
+    show B;
+    """)).parse(), workers=4, expect_parallel=False)
+    run_heuristic_test_case("Large heavy program, 1 worker", repeated_program(heavy, 5000),
+                            workers=1, expect_parallel=False)
+    run_heuristic_test_case("Large light program, 8 workers", repeated_program("sin(X) * cos(X) + sqrt(X)", 20000),
+                            workers=8, expect_parallel=False)
+
+    # Test Case 21: The cost heuristic sends a large heavy program to the pool
+    import multiprocessing
+    if "fork" in multiprocessing.get_all_start_methods():
+        run_heuristic_test_case("Large heavy program, 4 forked workers", repeated_program(heavy, 5000),
+                                workers=4, expect_parallel=True, context=multiprocessing.get_context("fork"))
+    else:
+        print("Test Skipped (the fork start method is not available)!\nLarge heavy program, 4 forked workers\n")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,285 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from interpreter import Interpreter
+from nodes import VariableNode, BinaryOperationNode, AssignmentNode, PrintNode, FunctionNode
+
+# Cost units of roughly 0.1 microseconds, measured on CPython 3.11, used to decide when parallelism pays off
+NUMBER_COST = 1  # Evaluating a number literal
+VARIABLE_COST = 2  # Looking up a variable
+OPERATOR_COST = 3  # Applying a binary operator, excluding its operands
+FUNCTION_CALL_COST = 9  # Calling a math function, excluding its arguments
+ASSIGNMENT_COST = 4  # Storing the result of a statement
+STATEMENT_DISPATCH_COST = 3  # Sending a statement index to a worker and merging its result back
+WORKER_STATEMENT_COST = 30  # A worker first touching a statement's nodes (copy-on-write page faults)
+READ_DISPATCH_COST = 2  # Sending one variable a statement reads to a worker
+PLANNING_COST = 37  # Building dependency levels, per statement
+PLANNING_SAMPLE_SIZE = 64  # Statements sampled to estimate the average statement cost
+LEVEL_DISPATCH_COST = 2000  # Submitting a level to the pool and waiting for all workers
+WORKER_STARTUP_COST = 40000  # Forking one worker process
+SPAWNED_WORKER_STARTUP_COST = 900000  # Spawning one worker process and importing the interpreter
+PROGRAM_TRANSFER_COST = 55  # Pickling one statement into a spawned worker
+
+
+def read_and_cost(node, reads):
+    """
+    Adds the variable names an expression reads to `reads` and returns its estimated cost in cost units.
+    """
+    if isinstance(node, VariableNode):
+        reads.add(node.name)
+        return VARIABLE_COST
+    elif isinstance(node, BinaryOperationNode):
+        return OPERATOR_COST + read_and_cost(node.left, reads) + read_and_cost(node.right, reads)
+    elif isinstance(node, FunctionNode):
+        cost = FUNCTION_CALL_COST
+        for argument in node.arguments:
+            cost += read_and_cost(argument, reads)
+        return cost
+    return NUMBER_COST  # NumberNode reads nothing
+
+
+def statement_cost(node):
+    """
+    Estimates the cost of evaluating an assignment statement in cost units.
+    """
+    return ASSIGNMENT_COST + read_and_cost(node.value, set())
+
+
+class Level:
+    def __init__(self):
+        self.assignments = []  # (statement index, AssignmentNode, names read) triples evaluated together
+        self.shows = []  # (statement index, PrintNode) pairs read before the level's writes
+        self.cost = 0  # Estimated cost of the level's assignments
+        self.reads = 0  # Total number of variables the level's assignments read
+        self.parallel = False  # Whether the level is sent to the worker pool
+
+    def __repr__(self):
+        return f"Level({len(self.assignments)} assignments, {len(self.shows)} shows, cost {self.cost})"
+
+
+def dependency_levels(nodes):
+    """
+    Groups statements into levels whose assignments are independent of each other.
+
+    Every statement in a level reads memory as it was when the level started, and
+    the level's writes are merged afterwards. A statement is placed after the level
+    of the last write to anything it reads (read after write) and after the last
+    write to the variable it assigns (write after write). An assignment may share a
+    level with earlier readers of the value it replaces, since they read the old value.
+
+    Args:
+        nodes (list): The AST returned by Parser.parse().
+
+    Returns:
+        list: Level objects in execution order.
+    """
+    levels = []
+    last_write = {}  # Variable name -> level of its most recent assignment
+    last_read = {}  # Variable name -> highest level that read its current value
+
+    for index, node in enumerate(nodes):
+        if isinstance(node, AssignmentNode):
+            reads = set()
+            cost = ASSIGNMENT_COST + read_and_cost(node.value, reads)
+            number = max(last_write.get(node.variable, -1) + 1, last_read.get(node.variable, 0))
+            for name in reads:
+                if last_write.get(name, -1) >= number:
+                    number = last_write[name] + 1
+            if number == len(levels):
+                levels.append(Level())  # A statement is at most one level past the last one
+            level = levels[number]
+            level.assignments.append((index, node, reads))
+            level.cost += cost
+            level.reads += len(reads)
+            last_write[node.variable] = number
+            last_read.pop(node.variable, None)  # Later readers see the new value
+        elif isinstance(node, PrintNode):
+            reads = (node.variable,)
+            number = last_write.get(node.variable, -1) + 1
+            if number == len(levels):
+                levels.append(Level())
+            levels[number].shows.append((index, node))
+        else:
+            raise ValueError(f"Unexpected statement {node}")
+        for name in reads:
+            if last_read.get(name, 0) < number:
+                last_read[name] = number
+    return levels
+
+
+_program = None  # The statements being run, loaded once into each worker process
+
+
+def _load_program(nodes):
+    """
+    Worker initializer: keeps the program so tasks only need to name statement indices.
+    """
+    global _program
+    _program = nodes
+
+
+def _evaluate_statements(indices, memory):
+    """
+    Worker entry point: evaluates the right-hand sides of the given assignments against a memory snapshot.
+    """
+    interpreter = Interpreter(memory=memory)
+    return [interpreter.evaluate(_program[index].value) for index in indices]
+
+
+def available_cpus():
+    """
+    Returns the number of CPUs this process may run on, which can be fewer than the host has
+    (e.g. in a container or under taskset).
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_context():
+    """
+    Returns a multiprocessing context for the current start method without fixing the
+    process-wide default, so callers can still use multiprocessing.set_start_method().
+    """
+    method = multiprocessing.get_start_method(allow_none=True)
+    return multiprocessing.get_context(method or multiprocessing.get_all_start_methods()[0])
+
+
+class ParallelInterpreter(Interpreter):
+    def __init__(self, memory=None, output=None, workers=None, force=False, context=None):
+        """
+        Initializes an interpreter that runs independent assignments across worker processes.
+        If no worker count is provided, it uses one worker per CPU available to this process.
+        If no multiprocessing context is provided, it uses the current start method. With force,
+        every level with more than one assignment goes to the pool regardless of cost, which
+        lets small programs exercise the parallel path in tests.
+        """
+        super().__init__(memory=memory, output=output)
+        self.workers = workers if workers is not None else available_cpus()
+        self.force = force
+        self.context = context if context is not None else default_context()
+
+    def startup_cost(self, nodes):
+        """
+        Estimates the cost of starting the worker pool and giving each worker the program.
+        Forked workers inherit the program; spawned ones receive it pickled.
+        """
+        if self.context.get_start_method() == 'fork':
+            return self.workers * WORKER_STARTUP_COST
+        return self.workers * (SPAWNED_WORKER_STARTUP_COST + len(nodes) * PROGRAM_TRANSFER_COST)
+
+    def worth_planning(self, nodes):
+        """
+        Cheaply estimates, from a sample of statements, whether the program could gain
+        enough from the pool to cover planning and start-up even if it were fully parallel.
+        """
+        sample = [node for node in nodes[:PLANNING_SAMPLE_SIZE] if isinstance(node, AssignmentNode)]
+        if not sample:
+            return False
+        average_cost = sum(statement_cost(node) for node in sample) / len(sample)
+        parallel_cost = (average_cost + WORKER_STATEMENT_COST) / self.workers + STATEMENT_DISPATCH_COST
+        best_saving = len(nodes) * (average_cost - parallel_cost)
+        return best_saving > len(nodes) * PLANNING_COST + self.startup_cost(nodes)
+
+    def level_saving(self, level):
+        """
+        Estimates the cost saved by sending a level to the worker pool instead of evaluating it here.
+        """
+        chunks = min(self.workers, len(level.assignments))
+        if chunks < 2:
+            return 0
+        if self.force:
+            return level.cost
+        worker_cost = level.cost + len(level.assignments) * WORKER_STATEMENT_COST
+        parallel_cost = (worker_cost / chunks + len(level.assignments) * STATEMENT_DISPATCH_COST
+                         + level.reads * READ_DISPATCH_COST + LEVEL_DISPATCH_COST)
+        return level.cost - parallel_cost
+
+    def plan(self, nodes):
+        """
+        Decides how to run a program.
+
+        Returns:
+            list: Level objects with the levels worth sending to the pool marked parallel,
+            or None if the program should run sequentially.
+        """
+        if self.workers < 2 or not (self.force or self.worth_planning(nodes)):
+            return None
+
+        levels = dependency_levels(nodes)
+        saved = 0
+        for level in levels:
+            saving = self.level_saving(level)
+            if saving > 0:
+                level.parallel = True
+                saved += saving
+        if saved <= 0 or (saved <= self.startup_cost(nodes) and not self.force):
+            return None
+        return levels
+
+    def interpret(self, nodes):
+        """
+        Executes a list of AST nodes level by level, keeping `show` output in the original order.
+        Falls back to sequential execution when parallelism is not expected to pay off, and
+        reruns sequentially from the original memory if any statement fails, so errors and
+        output match Interpreter.interpret exactly.
+
+        Args:
+            nodes (list): A list of AST nodes to interpret.
+        """
+        levels = self.plan(nodes)
+        if levels is None:
+            super().interpret(nodes)
+            return
+
+        snapshot = dict(self.variables)
+        try:
+            shown = self.interpret_levels(nodes, levels)
+        except Exception:
+            self.variables.clear()
+            self.variables.update(snapshot)
+            super().interpret(nodes)
+            return
+        for index, name, value in sorted(shown):
+            self.show(name, value)
+
+    def interpret_levels(self, nodes, levels):
+        """
+        Runs the planned levels and returns the shown values as (index, name, value) triples.
+        """
+        shown = []
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=self.context,
+                                 initializer=_load_program, initargs=(nodes,)) as pool:
+            for level in levels:
+                for index, node in level.shows:
+                    if node.variable not in self.variables:
+                        raise ValueError(f"Undefined variable: {node.variable}")
+                    shown.append((index, node.variable, self.variables[node.variable]))
+
+                if level.parallel:
+                    values = self.evaluate_in_pool(pool, level.assignments)
+                else:
+                    values = [self.evaluate(node.value) for index, node, reads in level.assignments]
+                for (index, node, reads), value in zip(level.assignments, values):
+                    self.variables[node.variable] = value  # Merge the level's results into memory
+        return shown
+
+    def evaluate_in_pool(self, pool, assignments):
+        """
+        Splits a level's assignments into one chunk per worker and evaluates them in the pool.
+        Each chunk is sent as statement indices plus only the variables it reads.
+        """
+        size = -(-len(assignments) // self.workers)  # Ceiling division
+        futures = []
+        for start in range(0, len(assignments), size):
+            chunk = assignments[start:start + size]
+            memory = {}
+            for index, node, reads in chunk:
+                for name in reads:
+                    if name in self.variables:
+                        memory[name] = self.variables[name]
+            futures.append(pool.submit(_evaluate_statements, [index for index, node, reads in chunk], memory))
+        values = []
+        for future in futures:
+            values.extend(future.result())
+        return values